@@ -0,0 +1,109 @@
+"""Benchmark catalog construction for large organizations.
+
+Builds the Harlequin catalog from a synthetic `/catalogs/hierarchy` response and
+synthetic table schemas, and reports the build time and peak memory for each
+catalog size. For comparison, it also reports the peak memory of decoding the raw
+hierarchy into plain dicts versus into the adapter's compact records.
+
+    $ python -m benchmarks.catalog_build [--tables 1000 10000 100000] [--columns 10]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from unittest.mock import Mock, patch
+
+from harlequin_wherobots.adapter import HarlequinWherobotsConnection
+from harlequin_wherobots.hierarchy import parse_hierarchy
+
+TABLES_PER_DATABASE = 100
+COLUMN_TYPES = ["string", "long", "double", "boolean", "geometry", "timestamp"]
+
+
+def hierarchy(tables: int) -> bytes:
+    databases = [
+        {
+            "name": f"db_{d}",
+            "description": "Synthetic benchmark database",
+            "tables": [
+                {"name": f"table_{t}", "type": "table", "format": "iceberg"}
+                for t in range(min(TABLES_PER_DATABASE, tables - d * TABLES_PER_DATABASE))
+            ],
+        }
+        for d in range((tables + TABLES_PER_DATABASE - 1) // TABLES_PER_DATABASE)
+    ]
+    return json.dumps({
+        "catalogs": [{"name": "bench", "extId": "bench-id", "type": "iceberg", "databases": databases}],
+    }).encode("utf-8")
+
+
+def schema(columns: int) -> bytes:
+    return json.dumps({
+        "name": "table",
+        "schema": {
+            "type": "struct",
+            "fields": [
+                {"id": i, "name": f"column_{i}", "type": COLUMN_TYPES[i % len(COLUMN_TYPES)], "required": False}
+                for i in range(columns)
+            ],
+        },
+    }).encode("utf-8")
+
+
+def measure(fn):
+    """Run fn, returning its result, elapsed seconds and peak traced memory in MiB."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def benchmark(tables: int, columns: int) -> None:
+    hierarchy_bytes = hierarchy(tables)
+    schema_bytes = schema(columns)
+
+    def get(url, headers):
+        response = Mock()
+        response.status_code = 200
+        if url.endswith("/catalogs/hierarchy"):
+            response.content = hierarchy_bytes
+        else:
+            # Decode on each call, like a real response would.
+            response.json.side_effect = lambda: json.loads(schema_bytes)
+        return response
+
+    conn = HarlequinWherobotsConnection.__new__(HarlequinWherobotsConnection)
+    conn.host = "api.cloud.wherobots.com"
+    conn.headers = {}
+
+    _, _, raw_peak = measure(lambda: json.loads(hierarchy_bytes))
+    _, _, compact_peak = measure(lambda: parse_hierarchy(hierarchy_bytes))
+    with patch("requests.get", side_effect=get):
+        catalog, elapsed, peak = measure(conn.get_catalog)
+    del catalog
+
+    print(
+        f"{tables:>8} tables {tables * columns:>9} columns | "
+        f"hierarchy: raw {raw_peak:8.1f} MiB, compact {compact_peak:8.1f} MiB | "
+        f"build: {elapsed:7.2f}s, peak {peak:8.1f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--columns", type=int, default=10, help="Columns per table.")
+    args = parser.parse_args()
+
+    for tables in args.tables:
+        benchmark(tables, args.columns)
+
+
+if __name__ == "__main__":
+    main()
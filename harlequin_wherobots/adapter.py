@@ -1,22 +1,35 @@
-from concurrent.futures import Future, ThreadPoolExecutor, wait
-from typing import Sequence
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar, Sequence
 
+import dataclasses
 import logging
+import math
 import os
+import re
+import sys
+import threading
+import time
 
 import pandas.io.json
 import pyarrow
 import requests
 from harlequin import HarlequinAdapter, HarlequinCursor, HarlequinConnection
-from harlequin.catalog import Catalog, CatalogItem
-from harlequin.exception import HarlequinConnectionError, HarlequinQueryError, HarlequinError
-from harlequin.options import HarlequinAdapterOption
+from harlequin.driver import HarlequinDriver
+from harlequin.catalog import Catalog, CatalogItem, InteractiveCatalogItem
+from harlequin.exception import HarlequinConnectionError, HarlequinCopyError, HarlequinQueryError, HarlequinError
+from harlequin.options import HarlequinAdapterOption, HarlequinCopyFormat
 from textual_fastdatatable.backend import AutoBackendType
-from wherobots.db import Connection, Cursor, connect, connect_direct, Runtime, Region
+from wherobots.db import Connection, Cursor, connect, connect_direct, Runtime, Region, Store, StorageFormat
 from wherobots.db.constants import DEFAULT_ENDPOINT
-from wherobots.db.errors import DatabaseError
+from wherobots.db.errors import DatabaseError, OperationalError
 
+from . import export, routing
 from .cli_options import WHEROBOTS_ADAPTER_OPTIONS
+from .copy_formats import WHEROBOTS_COPY_FORMATS
+from .hierarchy import CatalogRecord, parse_hierarchy
 
 # Setup logging if requested
 _log_file = os.getenv("WHEROBOTS_HARLEQUIN_ADAPTER_LOG")
@@ -30,9 +43,64 @@ if _log_file:
     )
 
 
+# Off by default: each ping resets the session's inactivity timer, keeping its runtime
+# (and its billing) up for as long as Harlequin stays open.
+DEFAULT_KEEPALIVE_INTERVAL_SECONDS: float = 0
+DEFAULT_MAX_RETRIES: int = 3
+DEFAULT_PREVIEW_ROWS: int = 100
+DEFAULT_PREVIEW_CACHE_SIZE: int = 16
+DEFAULT_PREVIEW_TTL_SECONDS: float = 300
+DEFAULT_HEAVY_IDLE_TIMEOUT_SECONDS: float = 600
+
+# Statements that only read data and can safely be re-executed after a connection loss.
+_READ_STATEMENTS = frozenset({"SELECT", "WITH", "VALUES", "TABLE", "SHOW", "DESCRIBE", "DESC", "EXPLAIN"})
+# Read statements producing a relation, that can be nested in another query.
+_QUERY_STATEMENTS = frozenset({"SELECT", "WITH", "VALUES", "TABLE"})
+_WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|CREATE|DROP|ALTER|TRUNCATE|CACHE)\b", re.IGNORECASE)
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def _is_read_query(query: str, statements: frozenset[str] = _READ_STATEMENTS) -> bool:
+    """Whether the query is an idempotent read that can be retried."""
+    query = _COMMENTS.sub(" ", query)
+    words = query.split(None, 1)
+    if not words or words[0].upper() not in statements:
+        return False
+    # CTEs can feed a write (WITH ... INSERT INTO ...); be conservative.
+    return not (words[0].upper() == "WITH" and _WRITE_KEYWORDS.search(query))
+
+
+def _is_connection_lost(e: Exception) -> bool:
+    """Whether the driver error was caused by losing the connection to the SQL session."""
+    return isinstance(e, OperationalError) and str(e).startswith("SQL connection lost")
+
+
 class HarlequinWherobotsCursor(HarlequinCursor):
-    def __init__(self, cursor: Cursor) -> None:
+    def __init__(
+        self,
+        cursor: Cursor,
+        query: str | None = None,
+        connection: "HarlequinWherobotsConnection | None" = None,
+        session: Connection | None = None,
+        statement: str | None = None,
+        heavy: bool = False,
+    ) -> None:
         self.cursor = cursor
+        self.query = query
+        # The statement actually submitted, when the query was rewritten.
+        self.statement = statement or query
+        self.connection = connection
+        self.session = session
+        # Whether the query runs on the heavy session, and still holds it.
+        self.heavy = heavy
+        self.holds_heavy = heavy
+        self.limit: int | None = None
+        # Guards the current driver cursor and the fetch state against the fetch timer.
+        self.fetch_lock = threading.Lock()
+        self.fetched = False
+        self.timed_out = False
+        # Set when the results were cut short by a guardrail.
+        self.warning: str | None = None
         self.results = None
         self.schema = None
 
@@ -49,23 +117,205 @@ class HarlequinWherobotsCursor(HarlequinCursor):
         ]
 
     def set_limit(self, limit: int) -> HarlequinCursor:
+        self.limit = limit
         return self
 
     def fetchall(self) -> AutoBackendType | None:
         if self.results is None:
             try:
-                self.results = self.cursor.fetchall()
+                results = self.__fetch()
+                # A cancelled query completes with empty results rather than an error.
+                if self.timed_out:
+                    raise self.__timeout_error()
+                self.results = self.__truncate(results)
                 self.schema = pandas.io.json.build_table_schema(self.results)
                 self.cursor.close()
                 self.cursor = None
             except DatabaseError as e:
+                if self.timed_out:
+                    raise self.__timeout_error() from e
                 raise HarlequinQueryError(f"Query error: {e}") from e
+            finally:
+                self.__release()
+            if self.connection is not None:
+                self.connection.memoize_preview(self.query, self.results)
+
+        results = self.results if self.limit is None else self.results.head(self.limit)
+        return pyarrow.Table.from_pandas(results)
+
+    def __fetch(self):
+        """Fetch the results, enforcing the fetch time limit."""
+        timer = None
+        if self.connection is not None and self.connection.max_fetch_seconds:
+            timer = threading.Timer(self.connection.max_fetch_seconds, self.__time_out)
+            timer.daemon = True
+            timer.start()
+        try:
+            results = self.__fetch_with_retries()
+            # Past this point the timer does nothing, so completed results are kept.
+            with self.fetch_lock:
+                self.fetched = True
+            return results
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def __time_out(self) -> None:
+        """Cancel the server-side query once the fetch time limit is exceeded."""
+        with self.fetch_lock:
+            if self.fetched:
+                return
+            self.timed_out = True
+            cursor = self.cursor
+        logging.warning("Query exceeded the fetch time limit; cancelling it ...")
+        if cursor is not None:
+            cursor.close()
+
+    def __timeout_error(self) -> HarlequinQueryError:
+        return HarlequinQueryError(
+            f"Query cancelled after exceeding the fetch time limit of "
+            f"{self.connection.max_fetch_seconds:g}s."
+        )
 
-        return pyarrow.Table.from_pandas(self.results)
+    def __truncate(self, results: pandas.DataFrame) -> pandas.DataFrame:
+        """Cut the results down to the configured row and size limits."""
+        if self.connection is None or results is None:
+            return results
+
+        max_rows = self.connection.max_rows
+        if max_rows is not None and len(results) > max_rows:
+            # The query was limited to one extra row, so that truncation is detected.
+            self.warning = f"Results truncated to the first {max_rows} rows (--max-rows)."
+            results = results.head(max_rows)
+
+        max_bytes = self.connection.max_bytes
+        if max_bytes is not None and len(results):
+            size = results.memory_usage(deep=True, index=False).sum()
+            if size > max_bytes:
+                rows = int(len(results) * max_bytes / size)
+                self.warning = (
+                    f"Results truncated to the first {rows} rows to fit "
+                    f"{max_bytes / 2**20:g} MiB (--max-result-size)."
+                )
+                results = results.head(rows)
+
+        if self.warning:
+            logging.warning(self.warning)
+        return results
+
+    def __fetch_with_retries(self):
+        """Fetch the results, re-executing read queries interrupted by a connection loss."""
+        attempt = 0
+        while True:
+            try:
+                return self.cursor.fetchall()
+            except DatabaseError as e:
+                if (
+                    self.connection is None
+                    or self.timed_out
+                    or not _is_connection_lost(e)
+                    or not _is_read_query(self.query or "")
+                    or attempt >= self.connection.max_retries
+                ):
+                    raise
+                attempt += 1
+                logging.warning(
+                    "Connection lost while running query; retrying (%d/%d) ...",
+                    attempt, self.connection.max_retries,
+                )
+                self.connection.reconnect(self.session, heavy=self.heavy)
+                session, cursor = self.connection.submit(self.statement, heavy=self.heavy)
+                with self.fetch_lock:
+                    self.session, self.cursor = session, cursor
+                    timed_out = self.timed_out
+                if timed_out:
+                    # The fetch timer fired while resubmitting, and missed this query.
+                    cursor.close()
+                    raise self.__timeout_error()
+
+    def __release(self) -> None:
+        """Let the heavy session go idle once this query is done with it."""
+        if self.holds_heavy:
+            self.holds_heavy = False
+            self.connection.release_heavy()
 
     def close(self) -> None:
         if self.cursor is not None:
             self.cursor.close()
+        self.__release()
+
+
+_NESTED_TYPES = frozenset({"struct", "list", "map"})
+
+
+def _preview_table(item: "TableCatalogItem", driver: HarlequinDriver) -> None:
+    """Open a bounded preview query of the table in a new buffer."""
+    driver.insert_text_in_new_buffer(item.connection.preview_query(item.query_name))
+
+
+@dataclass
+class TableCatalogItem(InteractiveCatalogItem["HarlequinWherobotsConnection"]):
+    """A table, whose columns are fetched in the background while the catalog is built."""
+
+    INTERACTIONS: ClassVar = [("Preview data", _preview_table)]
+    loaded: bool = True
+
+
+@dataclass
+class NestedColumnCatalogItem(InteractiveCatalogItem["HarlequinWherobotsConnection"]):
+    """A struct, list or map column, whose nested fields are only materialized when expanded."""
+
+    field_type: dict = dataclasses.field(default_factory=dict)
+
+    def fetch_children(self) -> list[CatalogItem]:
+        kind = self.field_type["type"]
+        if kind == "struct":
+            fields = self.field_type.get("fields", [])
+            entries = [
+                (f["name"], f"{self.query_name}.{f['name']}", f.get("type"))
+                for f in (fields if isinstance(fields, list) else [])
+                if isinstance(f, dict) and "name" in f
+            ]
+        elif kind == "list":
+            entries = [("element", f"{self.query_name}[0]", self.field_type.get("element"))]
+        else:
+            # map_keys() and map_values() return arrays, so the keys and values are
+            # lists of the key and value types.
+            entries = [
+                ("keys", f"map_keys({self.query_name})", {"type": "list", "element": self.field_type.get("key")}),
+                ("values", f"map_values({self.query_name})", {"type": "list", "element": self.field_type.get("value")}),
+            ]
+        return [
+            _column_item(f"{self.qualified_identifier}.{label}", query_name, label, field_type)
+            for label, query_name, field_type in entries
+        ]
+
+
+def _column_item(qualified_identifier: str, query_name: str, label: str, field_type) -> CatalogItem:
+    """Build the catalog item of a (possibly nested) column from its Iceberg type."""
+    if isinstance(field_type, str):
+        return CatalogItem(
+            qualified_identifier=qualified_identifier,
+            query_name=query_name,
+            label=label,
+            type_label=_intern(field_type),
+        )
+    kind = field_type.get("type") if isinstance(field_type, dict) else None
+    if kind in _NESTED_TYPES:
+        return NestedColumnCatalogItem(
+            qualified_identifier=qualified_identifier,
+            query_name=query_name,
+            label=label,
+            type_label=_intern(kind),
+            field_type=field_type,
+        )
+    logging.warning("Unexpected nested type for field %s: %r", qualified_identifier, field_type)
+    return CatalogItem(
+        qualified_identifier=qualified_identifier,
+        query_name=query_name,
+        label=label,
+        type_label=f"unknown (invalid type for field: {qualified_identifier})",
+    )
 
 
 class HarlequinWherobotsConnection(HarlequinConnection):
@@ -77,11 +327,56 @@ class HarlequinWherobotsConnection(HarlequinConnection):
         runtime: str | None = None,
         region: str | None = None,
         ws_url: str | None = None,
+        keepalive_interval: float | None = DEFAULT_KEEPALIVE_INTERVAL_SECONDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        preview_cache_size: int = DEFAULT_PREVIEW_CACHE_SIZE,
+        preview_ttl: float = DEFAULT_PREVIEW_TTL_SECONDS,
+        preview_sample_percent: float | None = None,
+        preview_tolerance: float | None = None,
+        heavy_runtime: str | None = None,
+        heavy_idle_timeout: float = DEFAULT_HEAVY_IDLE_TIMEOUT_SECONDS,
+        heavy_threshold: float | None = None,
+        max_rows: int | None = None,
+        max_bytes: int | None = None,
+        max_fetch_seconds: float | None = None,
         init_message: str = "",
     ) -> None:
-        self.init_message = init_message
         self.conn = None
         self.cursors = set()
+        self.lock = threading.Lock()
+        self.closing = threading.Event()
+        self.keepalive_interval = keepalive_interval
+        self.max_retries = max_retries
+
+        # Preview queries generated by preview_query(), and the results of the last ones
+        # run along with the time they were fetched at, least recently used first.
+        self.preview_queries: set[str] = set()
+        self.previews: OrderedDict[str, tuple[pandas.DataFrame, float]] = OrderedDict()
+        self.previews_lock = threading.Lock()
+        self.preview_cache_size = preview_cache_size
+        self.preview_ttl = preview_ttl
+        self.preview_sample_percent = preview_sample_percent
+        self.preview_tolerance = preview_tolerance
+
+        # Optional larger session, provisioned on demand for heavy queries and torn down
+        # once idle. heavy_active counts the queries running on it, and
+        # heavy_provisioning is set while the session is being provisioned.
+        self.heavy: Connection | None = None
+        self.heavy_provisioning: Future | None = None
+        self.heavy_runtime = Runtime[heavy_runtime] if heavy_runtime else None
+        self.heavy_idle_timeout = heavy_idle_timeout
+        self.heavy_threshold = heavy_threshold
+        self.heavy_lock = threading.Lock()
+        self.heavy_active = 0
+        self.heavy_last_used = 0.0
+
+        # Guardrails on the size of query results, and the time spent fetching them.
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_fetch_seconds = max_fetch_seconds
+        # Harlequin has no way to report a warning along with query results, so let
+        # the user know upfront that results may be cut short.
+        self.init_message = init_message or self.__guardrails_message()
 
         self.host = host
         self.token = token
@@ -96,24 +391,248 @@ class HarlequinWherobotsConnection(HarlequinConnection):
         elif api_key:
             self.headers["X-API-Key"] = api_key
 
+        self.conn: Connection = self.__connect()
+
+        if self.keepalive_interval:
+            threading.Thread(
+                target=self.__keepalive, daemon=True, name="wherobots-keepalive"
+            ).start()
+
+    def __guardrails_message(self) -> str:
+        """Describe the active result guardrails, if any."""
+        limits = []
+        if self.max_rows is not None:
+            limits.append(f"{self.max_rows} rows")
+        if self.max_bytes is not None:
+            limits.append(f"{self.max_bytes / 2**20:g} MiB")
+        sentences = []
+        if limits:
+            sentences.append(f"Query results are truncated to {' and '.join(limits)}.")
+        if self.max_fetch_seconds:
+            sentences.append(f"Queries are cancelled after {self.max_fetch_seconds:g}s of fetching.")
+        return " ".join(sentences)
+
+    def __connect(self) -> Connection:
         if self.ws_url:
-            self.conn: Connection = connect_direct(
+            return connect_direct(
                 uri=self.ws_url,
                 headers=self.headers,
             )
+        # Without force_new, this attaches to the already running SQL session.
+        return connect(
+            host=self.host,
+            token=self.token,
+            api_key=self.api_key,
+            runtime=self.runtime,
+            region=self.region,
+        )
+
+    def reconnect(self, stale: Connection | None = None, heavy: bool = False) -> Connection:
+        """Re-establish the connection to the SQL session.
+
+        If `stale` is given and the connection was already re-established since, the
+        current connection is returned as-is. With `heavy`, the heavy session is
+        re-established instead: `stale` is dropped if it is still the heavy session,
+        and the heavy session is returned, provisioning it again if needed. The light
+        session is never returned for the heavy one.
+        """
+        if heavy:
+            with self.heavy_lock:
+                dropped = stale is not None and self.heavy is stale
+                if dropped:
+                    self.heavy = None
+            if dropped:
+                stale.close()
+            return self.__heavy_session()
+
+        with self.lock:
+            if stale is not None and self.conn is not stale:
+                return self.conn
+            logging.warning("Reconnecting to Wherobots SQL session ...")
+            old = self.conn
+            self.conn = self.__connect()
+        if old is not None:
+            try:
+                old.close()
+            except Exception:
+                logging.debug("Error closing stale connection", exc_info=True)
+        return self.conn
+
+    def submit(self, query: str, heavy: bool = False, store: Store | None = None) -> tuple[Connection, Cursor]:
+        """Submit a query, reconnecting first if the connection is found dead.
+
+        With `store`, the results are written to cloud storage instead of being sent
+        back. Returns the connection the query was submitted on along with its cursor.
+        """
+        options = {"store": store} if store is not None else {}
+        if heavy:
+            conn = self.__heavy_session()
         else:
-            self.conn: Connection = connect(
+            conn = self.conn
+        cursor: Cursor = conn.cursor()
+        try:
+            cursor.execute(query, **options)
+        except OperationalError as e:
+            # A query is never sent on a closed connection, so resubmitting is always safe.
+            if not _is_connection_lost(e):
+                raise
+            conn = self.reconnect(conn, heavy=heavy)
+            cursor = conn.cursor()
+            cursor.execute(query, **options)
+        return conn, cursor
+
+    def route(self, query: str) -> bool:
+        """Whether the query should run on the heavy session.
+
+        An explicit `wherobots:heavy` or `wherobots:light` hint comment in the query
+        always wins. Otherwise, if a threshold is set, read queries are routed to the
+        heavy session when the plan's estimated data size exceeds it.
+        """
+        if self.heavy_runtime is None:
+            return False
+        hint = routing.routing_hint(query)
+        if hint is not None:
+            return hint == routing.HEAVY
+        if self.heavy_threshold is None or not _is_read_query(query, _QUERY_STATEMENTS):
+            return False
+
+        try:
+            _, cursor = self.submit(f"EXPLAIN COST {_strip_query(query)}")
+            try:
+                plan = cursor.fetchall().iloc[0, 0]
+            finally:
+                cursor.close()
+        except DatabaseError as e:
+            logging.debug("Could not estimate query cost, not routing to heavy session: %s", e)
+            return False
+        size = routing.estimated_size(str(plan))
+        logging.debug("Estimated query size: %s bytes", size)
+        return size is not None and size > self.heavy_threshold
+
+    def __heavy_session(self) -> Connection:
+        """Get the heavy session, provisioning it first if needed.
+
+        Provisioning can take minutes, so it happens outside of heavy_lock; concurrent
+        callers wait for the same provisioning to complete.
+        """
+        with self.heavy_lock:
+            if self.heavy is not None:
+                return self.heavy
+            provisioning = self.heavy_provisioning
+            owner = provisioning is None
+            if owner:
+                provisioning = self.heavy_provisioning = Future()
+        if not owner:
+            return provisioning.result()
+
+        logging.info("Provisioning %s runtime for heavy queries ...", self.heavy_runtime.value)
+        try:
+            session = connect(
                 host=self.host,
                 token=self.token,
                 api_key=self.api_key,
-                runtime=self.runtime,
+                runtime=self.heavy_runtime,
                 region=self.region,
+                force_new=True,
+                # Let the session shut itself down if this process goes away.
+                shutdown_after_inactive_seconds=max(1, math.ceil(self.heavy_idle_timeout)),
             )
+        except BaseException as e:
+            with self.heavy_lock:
+                self.heavy_provisioning = None
+            provisioning.set_exception(e)
+            raise
+
+        with self.heavy_lock:
+            self.heavy_provisioning = None
+            closing = self.closing.is_set()
+            if not closing:
+                self.heavy = session
+                self.heavy_last_used = time.monotonic()
+        if closing:
+            session.close()
+            error = HarlequinConnectionError("Connection closed while provisioning the heavy session")
+            provisioning.set_exception(error)
+            raise error
+
+        threading.Thread(
+            target=self.__reap_heavy, args=(session,), daemon=True, name="wherobots-heavy-reaper"
+        ).start()
+        provisioning.set_result(session)
+        return session
+
+    def acquire_heavy(self) -> None:
+        with self.heavy_lock:
+            self.heavy_active += 1
+
+    def release_heavy(self) -> None:
+        with self.heavy_lock:
+            self.heavy_active = max(0, self.heavy_active - 1)
+            self.heavy_last_used = time.monotonic()
+
+    def __reap_heavy(self, session: Connection) -> None:
+        """Close the heavy session once it has been idle for the idle timeout."""
+        # Poll at most every 30s, and at least every second even with a tiny timeout.
+        while not self.closing.wait(max(1, min(self.heavy_idle_timeout, 30))):
+            with self.heavy_lock:
+                if self.heavy is not session:
+                    return
+                if self.heavy_active or time.monotonic() - self.heavy_last_used < self.heavy_idle_timeout:
+                    continue
+                self.heavy = None
+            logging.info("Closing idle heavy session ...")
+            session.close()
+            return
+
+    def __keepalive(self) -> None:
+        """Periodically ping the SQL session, reconnecting if the connection was lost."""
+        while not self.closing.wait(self.keepalive_interval):
+            conn = self.conn
+            cursor: Cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            except Exception as e:
+                if self.closing.is_set():
+                    return
+                if not _is_connection_lost(e):
+                    logging.warning("Keepalive query failed: %s", e)
+                    continue
+                logging.warning("Lost connection to Wherobots SQL session")
+                try:
+                    self.reconnect(conn)
+                except Exception:
+                    logging.exception("Failed to reconnect to Wherobots SQL session")
+            finally:
+                cursor.close()
 
     def execute(self, query: str) -> HarlequinCursor | None:
-        cursor: Cursor = self.conn.cursor()
-        cursor.execute(query)
-        hc = HarlequinWherobotsCursor(cursor)
+        results = self.__cached_preview(query.strip())
+        if results is not None:
+            logging.info("Serving table preview from cache")
+            hc = HarlequinWherobotsCursor(None, query=query)
+            hc.results = results
+            hc.schema = pandas.io.json.build_table_schema(results)
+            return hc
+
+        if not _is_read_query(query):
+            # The statement may change the data of any previewed table.
+            self.invalidate_previews()
+
+        statement = self.limit_rows(self.simplify_geometries(query))
+        heavy = self.route(query)
+        if heavy:
+            # Hold the heavy session before submitting, so it can't be reaped in between.
+            self.acquire_heavy()
+        try:
+            session, cursor = self.submit(statement, heavy=heavy)
+        except Exception:
+            if heavy:
+                self.release_heavy()
+            raise
+        hc = HarlequinWherobotsCursor(
+            cursor, query=query, statement=statement, connection=self, session=session, heavy=heavy
+        )
         self.cursors.add(hc)
         return hc
 
@@ -121,6 +640,159 @@ class HarlequinWherobotsConnection(HarlequinConnection):
         for cursor in self.cursors:
             cursor.close()
 
+    def simplify_geometries(self, query: str) -> str:
+        """Rewrite the geometry columns of a query to reduced-resolution versions.
+
+        When a preview tolerance is set, geometries are snapped to a precision grid
+        matching the tolerance and simplified, shrinking result payloads of map-heavy
+        queries by orders of magnitude. Exports always use full-fidelity geometries.
+        """
+        if not self.preview_tolerance or not _is_read_query(query, _QUERY_STATEMENTS):
+            return query
+        try:
+            columns = self.describe(query)
+        except DatabaseError as e:
+            # Let the query itself run and report the error.
+            logging.debug("Could not describe query, not simplifying geometries: %s", e)
+            return query
+
+        tolerance = self.preview_tolerance
+        decimals = max(0, math.ceil(-math.log10(tolerance)))
+        return _rewrite_geometries(
+            query,
+            columns,
+            lambda column: f"ST_SimplifyPreserveTopology(ST_ReducePrecision({column}, {decimals}), {tolerance})",
+        )
+
+    def limit_rows(self, query: str) -> str:
+        """Limit a query to one row more than --max-rows, so no more leave the session.
+
+        The extra row lets the cursor tell whether the results were truncated.
+        """
+        if self.max_rows is None or not _is_read_query(query, _QUERY_STATEMENTS):
+            return query
+        return f"{_wrap_query('*', query)} LIMIT {self.max_rows + 1}"
+
+    def preview_query(self, table: str, limit: int = DEFAULT_PREVIEW_ROWS) -> str:
+        """Build a bounded query previewing a table.
+
+        With a preview sample percentage, rows are sampled from across the table with
+        TABLESAMPLE; otherwise the LIMIT lets the scan stop after the first few files.
+        Once run, the results of the last previews are memoized for `preview_ttl`
+        seconds, and served by execute() without running the query again.
+        """
+        sample = f" TABLESAMPLE ({self.preview_sample_percent:g} PERCENT)" if self.preview_sample_percent else ""
+        query = f"SELECT * FROM {table}{sample} LIMIT {int(limit)}"
+        with self.previews_lock:
+            self.preview_queries.add(query)
+        return query
+
+    def memoize_preview(self, query: str | None, results: pandas.DataFrame) -> None:
+        """Remember the results of a query if it is a preview query."""
+        query = (query or "").strip()
+        with self.previews_lock:
+            if query not in self.preview_queries:
+                return
+            self.previews[query] = (results, time.monotonic())
+            self.previews.move_to_end(query)
+            while len(self.previews) > self.preview_cache_size:
+                self.previews.popitem(last=False)
+
+    def __cached_preview(self, query: str) -> pandas.DataFrame | None:
+        """The memoized results of a preview query, unless they expired."""
+        with self.previews_lock:
+            cached = self.previews.get(query)
+            if cached is None:
+                return None
+            results, fetched_at = cached
+            if time.monotonic() - fetched_at > self.preview_ttl:
+                del self.previews[query]
+                return None
+            self.previews.move_to_end(query)
+            return results
+
+    def invalidate_previews(self) -> None:
+        """Forget the memoized preview results, so previews are run again."""
+        with self.previews_lock:
+            self.previews.clear()
+
+    def describe(self, query: str) -> list[tuple[str, str]]:
+        """Return the (name, type) of each column the given query would produce.
+
+        This only plans the query on the SQL session, it does not execute it.
+        """
+        _, cursor = self.submit(f"DESCRIBE QUERY {_strip_query(query)}")
+        try:
+            results = cursor.fetchall()
+        finally:
+            cursor.close()
+        return [(row["col_name"], row["data_type"]) for _, row in results.iterrows()]
+
+    def export(
+        self,
+        query: str,
+        path: str,
+        format_name: str = "parquet",
+        batch_size: int = export.DEFAULT_BATCH_SIZE,
+        progress: export.ProgressHandler | None = export.log_progress,
+    ) -> int:
+        """Export the results of a query to a local Parquet (GeoParquet) or Arrow IPC file.
+
+        The results are written by the SQL session to cloud storage, streamed down to a
+        temporary file, and rewritten into `path` one record batch at a time, so that
+        the whole result is never held in memory. Geometry columns are exported as WKB.
+        Heavy queries are routed to the heavy session, as by execute(). Returns the
+        number of rows written.
+        """
+        heavy = self.route(query)
+        columns = self.describe(query)
+        geometry_columns = [name for name, data_type in columns if data_type == "geometry"]
+        query = _rewrite_geometries(query, columns, lambda column: f"ST_AsBinary({column})")
+
+        if heavy:
+            # Hold the heavy session until the results are stored, so it isn't reaped.
+            self.acquire_heavy()
+        try:
+            _, cursor = self.submit(query, heavy=heavy, store=Store.for_download(StorageFormat.PARQUET))
+            try:
+                store_result = cursor.get_store_result()
+            finally:
+                cursor.close()
+        finally:
+            if heavy:
+                self.release_heavy()
+        if store_result is None:
+            raise HarlequinCopyError("Query did not produce an exportable result")
+
+        download = export.temporary_path(path)
+        try:
+            export.download(store_result.result_uri, download, progress=progress)
+            return export.transcode(
+                download,
+                path,
+                format_name,
+                geometry_columns=geometry_columns,
+                batch_size=batch_size,
+                progress=progress,
+            )
+        finally:
+            if os.path.exists(download):
+                os.remove(download)
+
+    def copy(self, query: str, path: Path, format_name: str, options: dict[str, Any]) -> None:
+        try:
+            rows = self.export(
+                query,
+                str(path),
+                format_name=format_name,
+                batch_size=int(options.get("batch_size") or export.DEFAULT_BATCH_SIZE),
+            )
+            logging.info("Exported %d rows to %s", rows, path)
+        except HarlequinCopyError:
+            raise
+        except Exception as e:
+            raise HarlequinCopyError(f"Failed to export query results: {e}") from e
+
     def get_catalog(self) -> Catalog:
         try:
             response = requests.get(
@@ -133,61 +805,65 @@ class HarlequinWherobotsConnection(HarlequinConnection):
 
         executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="wherobots-catalog-fetcher")
         try:
-            items = self.__build_catalog(response.json(), executor)
+            items = self.__build_catalog(parse_hierarchy(response.content), executor)
             return Catalog(items)
         except Exception as e:
             raise HarlequinError("Invalid catalog data!") from e
         finally:
+            # Table schemas are fetched in the background; wait for all of them to
+            # populate their table's children.
             executor.shutdown(wait=True)
 
-    def __build_catalog(self, response, executor: ThreadPoolExecutor):
+    def __build_catalog(self, catalogs: list[CatalogRecord], executor: ThreadPoolExecutor):
         items: list[CatalogItem] = []
-        tasks: list[Future] = []
-        for catalog in response["catalogs"]:
+        for catalog in catalogs:
             dbs: list[CatalogItem] = []
-            for db in catalog["databases"]:
+            for db in catalog.databases:
+                db_qualified_identifier = f"{catalog.name}.{db.name}"
                 tables: list[CatalogItem] = []
-                for table in db["tables"]:
+                for table in db.tables:
                     children = []
+                    table_qualified_identifier = f"{db_qualified_identifier}.{table}"
                     tables.append(
-                        CatalogItem(
-                            qualified_identifier=f"{catalog['name']}.{db['name']}.{table['name']}",
-                            query_name=f"{catalog['name']}.{db['name']}.{table['name']}",
-                            label=table["name"],
+                        TableCatalogItem(
+                            qualified_identifier=table_qualified_identifier,
+                            query_name=table_qualified_identifier,
+                            label=table,
                             type_label="table",
                             children=children,
+                            connection=self,
                         )
                     )
-                    task: Future = executor.submit(
+                    # Futures are not kept around: completed ones can be released
+                    # right away, and get_catalog() waits on the executor instead.
+                    executor.submit(
                         self.__get_table_schema,
-                        catalog["extId"],
-                        catalog["name"],
-                        db["name"],
-                        table["name"],
+                        catalog.ext_id,
+                        catalog.name,
+                        db.name,
+                        table,
                         children,
                     )
-                    tasks.append(task)
 
                 dbs.append(
                     CatalogItem(
-                        qualified_identifier=f"{catalog['name']}.{db['name']}",
-                        query_name=f"{catalog['name']}.{db['name']}",
-                        label=db["name"],
+                        qualified_identifier=db_qualified_identifier,
+                        query_name=db_qualified_identifier,
+                        label=db.name,
                         type_label="db",
                         children=tables,
                     )
                 )
             items.append(
                 CatalogItem(
-                    qualified_identifier=catalog["name"],
-                    query_name=catalog["name"],
-                    label=catalog["name"],
+                    qualified_identifier=catalog.name,
+                    query_name=catalog.name,
+                    label=catalog.name,
                     type_label="catalog",
                     children=dbs,
                 )
             )
 
-        wait(tasks)
         return items
 
     def __get_table_schema(self, catalog_id, catalog, db, table, into):
@@ -205,34 +881,43 @@ class HarlequinWherobotsConnection(HarlequinConnection):
         fields = schema.get("fields", [])
         if not isinstance(fields, list):
             return
-        
+
+        # Column names and type labels repeat heavily across tables; intern them so that
+        # very large catalogs share a single copy of each.
+        prefix = f"{catalog}.{db}.{table}."
         for field in fields:
-            field_name = field["name"]
+            if not isinstance(field.get("name"), str):
+                logging.warning("Invalid field name in table %s.%s.%s: %r", catalog, db, table, field)
+                continue
+            field_name = _intern(field["name"])
             field_type = field["type"]
-            
-            # For nested types (struct, list, map), extract just the type name
-            # TODO: handle nested types better (e.g. nested column with children)
+            qualified_identifier = prefix + field_name
+
+            # Nested types (struct, list, map) expand into their fields when opened.
             if isinstance(field_type, dict):
                 if "type" in field_type:
-                    type_label = field_type["type"]
+                    if field_type["type"] in _NESTED_TYPES:
+                        into.append(_column_item(qualified_identifier, field_name, field_name, field_type))
+                        continue
+                    type_label = _intern(field_type["type"])
                 else:
                     logging.warning(
                         "Missing 'type' in field_type for field '%s' in table %s.%s.%s: %r",
                         field_name, catalog, db, table, field_type
                     )
-                    type_label = f"unknown (missing type for field: {catalog}.{db}.{table}.{field_name})"
+                    type_label = f"unknown (missing type for field: {qualified_identifier})"
             elif isinstance(field_type, str):
-                type_label = field_type
+                type_label = _intern(field_type)
             else:
                 logging.warning(
                     "Unexpected field_type format for field '%s' in table %s.%s.%s: %r",
                     field_name, catalog, db, table, field_type
                 )
-                type_label = f"unknown (invalid type for field: {catalog}.{db}.{table}.{field_name})"
-            
+                type_label = f"unknown (invalid type for field: {qualified_identifier})"
+
             into.append(
                 CatalogItem(
-                    qualified_identifier=f"{catalog}.{db}.{table}.{field_name}",
+                    qualified_identifier=qualified_identifier,
                     query_name=field_name,
                     label=field_name,
                     type_label=type_label,
@@ -240,11 +925,59 @@ class HarlequinWherobotsConnection(HarlequinConnection):
             )
 
     def close(self):
+        self.closing.set()
+        with self.heavy_lock:
+            heavy, self.heavy = self.heavy, None
+        if heavy:
+            logging.info("Closing heavy session ...")
+            heavy.close()
         if self.conn:
             logging.info("Closing connection to Wherobots ...")
             self.conn.close()
 
 
+def _intern(value):
+    """Intern `value` if it is a string, so that repeated labels share one copy."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _rewrite_geometries(query: str, columns: list[tuple[str, str]], expression) -> str:
+    """Wrap the query to apply `expression` to each of its geometry columns.
+
+    `columns` are the (name, type) of the query's columns, as returned by describe().
+    `expression` receives the quoted column name and returns the SQL expression to use.
+    The query is returned unchanged if it has no geometry column, or if some of its
+    columns share a name (e.g. `SELECT * FROM a JOIN b`), as they can't be referenced.
+    """
+    if not any(data_type == "geometry" for _, data_type in columns):
+        return query
+    # Spark resolves column names case-insensitively by default.
+    if len({name.lower() for name, _ in columns}) < len(columns):
+        logging.debug("Query has duplicate column names, not rewriting geometries")
+        return query
+    projection = ", ".join(
+        f"{expression(_quote(name))} AS {_quote(name)}" if data_type == "geometry" else _quote(name)
+        for name, data_type in columns
+    )
+    return _wrap_query(projection, query)
+
+
+def _wrap_query(projection: str, query: str) -> str:
+    """Select `projection` from the results of the query, as a subquery."""
+    # The inner query goes on its own lines, in case it ends with a comment.
+    return f"SELECT {projection} FROM (\n{_strip_query(query)}\n)"
+
+
+def _strip_query(query: str) -> str:
+    """Strip whitespace and trailing semicolons so the query can be nested."""
+    return query.strip().rstrip(";").strip()
+
+
+def _quote(identifier: str) -> str:
+    """Quote a column identifier for Spark SQL."""
+    return "`" + identifier.replace("`", "``") + "`"
+
+
 class HarlequinWherobotsAdapter(HarlequinAdapter):
     """Harlequin adapter for Wherobots DB, using the Wherobots Spatial SQL API.
 
@@ -256,6 +989,7 @@ class HarlequinWherobotsAdapter(HarlequinAdapter):
     """
 
     ADAPTER_OPTIONS: list[HarlequinAdapterOption] | None = WHEROBOTS_ADAPTER_OPTIONS
+    COPY_FORMATS: list[HarlequinCopyFormat] | None = WHEROBOTS_COPY_FORMATS
     IMPLEMENTS_CANCEL = True
 
     def __init__(
@@ -266,6 +1000,16 @@ class HarlequinWherobotsAdapter(HarlequinAdapter):
         runtime: str | None = None,
         region: str | None = None,
         ws_url: str | None = None,
+        keepalive_interval: str | None = None,
+        max_retries: str | None = None,
+        preview_tolerance: str | None = None,
+        preview_sample_percent: str | None = None,
+        heavy_runtime: str | None = None,
+        heavy_idle_timeout: str | None = None,
+        heavy_threshold: str | None = None,
+        max_rows: str | None = None,
+        max_result_size: str | None = None,
+        max_fetch_seconds: str | None = None,
     ) -> None:
         self.conn_str = conn_str
         self.token = token
@@ -273,6 +1017,22 @@ class HarlequinWherobotsAdapter(HarlequinAdapter):
         self.runtime = runtime
         self.region = region
         self.ws_url = ws_url
+        self.keepalive_interval = (
+            float(keepalive_interval) if keepalive_interval is not None else DEFAULT_KEEPALIVE_INTERVAL_SECONDS
+        )
+        self.max_retries = int(max_retries) if max_retries is not None else DEFAULT_MAX_RETRIES
+        self.preview_tolerance = float(preview_tolerance) if preview_tolerance else None
+        self.preview_sample_percent = float(preview_sample_percent) if preview_sample_percent else None
+        self.heavy_runtime = heavy_runtime
+        self.heavy_idle_timeout = (
+            float(heavy_idle_timeout) if heavy_idle_timeout is not None else DEFAULT_HEAVY_IDLE_TIMEOUT_SECONDS
+        )
+        # The threshold is given in GiB.
+        self.heavy_threshold = float(heavy_threshold) * 2**30 if heavy_threshold else None
+        self.max_rows = int(max_rows) if max_rows else None
+        # The result size limit is given in MiB.
+        self.max_bytes = int(float(max_result_size) * 2**20) if max_result_size else None
+        self.max_fetch_seconds = float(max_fetch_seconds) if max_fetch_seconds else None
 
     def connect(self) -> HarlequinConnection:
         """Establish a connection to the Wherobots.
@@ -295,6 +1055,16 @@ class HarlequinWherobotsAdapter(HarlequinAdapter):
                 runtime=self.runtime,
                 region=self.region,
                 ws_url=self.ws_url,
+                keepalive_interval=self.keepalive_interval,
+                max_retries=self.max_retries,
+                preview_tolerance=self.preview_tolerance,
+                preview_sample_percent=self.preview_sample_percent,
+                heavy_runtime=self.heavy_runtime,
+                heavy_idle_timeout=self.heavy_idle_timeout,
+                heavy_threshold=self.heavy_threshold,
+                max_rows=self.max_rows,
+                max_bytes=self.max_bytes,
+                max_fetch_seconds=self.max_fetch_seconds,
             )
         except Exception as e:
             logging.exception(e)
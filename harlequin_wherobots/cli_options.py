@@ -2,6 +2,43 @@ from harlequin.options import TextOption, SelectOption
 from wherobots.db.region import Region
 from wherobots.db.runtime import Runtime
 
+
+def _validate_non_negative_float(raw: str) -> tuple[bool, str | None]:
+    try:
+        if float(raw) >= 0:
+            return True, None
+    except ValueError:
+        pass
+    return False, "Must be a non-negative number."
+
+
+def _validate_positive_float(raw: str) -> tuple[bool, str | None]:
+    try:
+        if float(raw) > 0:
+            return True, None
+    except ValueError:
+        pass
+    return False, "Must be a positive number."
+
+
+def _validate_percent(raw: str) -> tuple[bool, str | None]:
+    try:
+        if 0 < float(raw) <= 100:
+            return True, None
+    except ValueError:
+        pass
+    return False, "Must be a number greater than 0 and at most 100."
+
+
+def _validate_non_negative_int(raw: str) -> tuple[bool, str | None]:
+    try:
+        if int(raw) >= 0:
+            return True, None
+    except ValueError:
+        pass
+    return False, "Must be a non-negative integer."
+
+
 token = TextOption(
     name="token",
     short_decls=["-t"],
@@ -33,10 +70,95 @@ ws_url = TextOption(
     description="Direct SQL Session URL to connect to.",
 )
 
+keepalive_interval = TextOption(
+    name="keepalive-interval",
+    description=(
+        "Seconds between keepalive queries on the SQL session. Defaults to 0 (disabled). Each "
+        "query keeps the session's runtime running, and billed, for as long as Harlequin is open."
+    ),
+    validator=_validate_non_negative_float,
+)
+
+max_retries = TextOption(
+    name="max-retries",
+    description="How many times to retry a read query interrupted by a connection loss. Defaults to 3.",
+    validator=_validate_non_negative_int,
+)
+
+preview_tolerance = TextOption(
+    name="preview-tolerance",
+    description=(
+        "Simplify geometries in query results to this tolerance, in the units of their "
+        "coordinate system, to cut transfer size. Exports are not affected. Disabled by default."
+    ),
+    validator=_validate_non_negative_float,
+)
+
+preview_sample_percent = TextOption(
+    name="preview-sample-percent",
+    description=(
+        "Sample table previews from across the table with TABLESAMPLE, keeping this "
+        "percentage of rows. By default, previews read the first rows of the table."
+    ),
+    validator=_validate_percent,
+)
+
+heavy_runtime = SelectOption(
+    name="heavy-runtime",
+    description="A larger Wherobots runtime to provision on demand for heavy queries.",
+    choices=list(Runtime.__members__.keys()),
+)
+
+heavy_idle_timeout = TextOption(
+    name="heavy-idle-timeout",
+    description="Seconds of inactivity after which the heavy runtime session is torn down. Defaults to 600.",
+    validator=_validate_positive_float,
+)
+
+heavy_threshold = TextOption(
+    name="heavy-threshold",
+    description=(
+        "Route queries whose estimated data size exceeds this many GiB to the heavy runtime. "
+        "Without it, only queries hinted with a `-- wherobots:heavy` comment are."
+    ),
+    validator=_validate_non_negative_float,
+)
+
+max_rows = TextOption(
+    name="max-rows",
+    description="Truncate query results to this many rows. The limit is pushed down into the query.",
+    validator=_validate_non_negative_int,
+)
+
+max_result_size = TextOption(
+    name="max-result-size",
+    description=(
+        "Trim the displayed query results to fit in this many MiB. This applies once the "
+        "results were fetched, so it does not bound memory use; --max-rows does."
+    ),
+    validator=_validate_non_negative_float,
+)
+
+max_fetch_seconds = TextOption(
+    name="max-fetch-seconds",
+    description="Cancel queries whose results take longer than this many seconds to arrive.",
+    validator=_validate_non_negative_float,
+)
+
 WHEROBOTS_ADAPTER_OPTIONS = [
     token,
     api_key,
     runtime,
     region,
     ws_url,
+    keepalive_interval,
+    max_retries,
+    preview_tolerance,
+    preview_sample_percent,
+    heavy_runtime,
+    heavy_idle_timeout,
+    heavy_threshold,
+    max_rows,
+    max_result_size,
+    max_fetch_seconds,
 ]
@@ -0,0 +1,40 @@
+from harlequin.options import HarlequinCopyFormat, TextOption
+
+from .export import DEFAULT_BATCH_SIZE
+
+
+def _validate_positive_int(raw: str) -> tuple[bool, str | None]:
+    try:
+        if int(raw) > 0:
+            return True, None
+    except ValueError:
+        pass
+    return False, "Must be a positive integer."
+
+
+batch_size = TextOption(
+    name="batch_size",
+    description="The number of rows held in memory and written at a time.",
+    label="Batch Size",
+    default=str(DEFAULT_BATCH_SIZE),
+    validator=_validate_positive_int,
+)
+
+parquet = HarlequinCopyFormat(
+    name="parquet",
+    label="Parquet (GeoParquet)",
+    extensions=(".parquet", ".geoparquet"),
+    options=[batch_size],
+)
+
+arrow = HarlequinCopyFormat(
+    name="arrow",
+    label="Arrow IPC",
+    extensions=(".arrow", ".feather"),
+    options=[batch_size],
+)
+
+WHEROBOTS_COPY_FORMATS = [
+    parquet,
+    arrow,
+]
@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+import requests
+
+DEFAULT_CHUNK_SIZE: int = 8 * 2**20  # 8MiB
+DEFAULT_BATCH_SIZE: int = 65536
+
+GEOPARQUET_VERSION: str = "1.1.0"
+
+
+@dataclass(frozen=True)
+class ExportProgress:
+    """Progress information for a running export.
+
+    Attributes:
+        stage: The export stage, either "download" or "write".
+        bytes_done: The number of bytes downloaded or written so far.
+        rows_done: The number of rows written so far (always 0 while downloading).
+        elapsed: The number of seconds elapsed since the stage started.
+    """
+
+    stage: str
+    bytes_done: int
+    rows_done: int
+    elapsed: float
+
+    @property
+    def throughput(self) -> float:
+        """Throughput of the stage, in bytes per second."""
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressHandler = Callable[[ExportProgress], None]
+
+
+def log_progress(progress: ExportProgress) -> None:
+    logging.info(
+        "Export %s: %d rows, %.1f MiB in %.1fs (%.1f MiB/s)",
+        progress.stage,
+        progress.rows_done,
+        progress.bytes_done / 2**20,
+        progress.elapsed,
+        progress.throughput / 2**20,
+    )
+
+
+def download(
+    url: str,
+    path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressHandler | None = None,
+) -> int:
+    """Stream the contents of `url` into the local file at `path`, one chunk at a time.
+
+    Returns the number of bytes written.
+    """
+    start = time.monotonic()
+    written = 0
+    with requests.get(url, stream=True) as response:
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+                if progress:
+                    progress(ExportProgress("download", written, 0, time.monotonic() - start))
+    return written
+
+
+def geoparquet_metadata(schema: pyarrow.Schema, geometry_columns: list[str]) -> dict[bytes, bytes]:
+    """Build the GeoParquet "geo" file metadata for the given WKB geometry columns."""
+    geo = {
+        "version": GEOPARQUET_VERSION,
+        "primary_column": geometry_columns[0],
+        "columns": {
+            name: {"encoding": "WKB", "geometry_types": []}
+            for name in geometry_columns
+        },
+    }
+    return {**(schema.metadata or {}), b"geo": json.dumps(geo).encode("utf-8")}
+
+
+def geoarrow_schema(schema: pyarrow.Schema, geometry_columns: list[str]) -> pyarrow.Schema:
+    """Tag the given WKB geometry columns with the GeoArrow extension name."""
+    for name in geometry_columns:
+        i = schema.get_field_index(name)
+        f = schema.field(i)
+        schema = schema.set(
+            i, f.with_metadata({**(f.metadata or {}), b"ARROW:extension:name": b"geoarrow.wkb"})
+        )
+    return schema
+
+
+def transcode(
+    source: str,
+    dest: str,
+    format_name: str,
+    geometry_columns: list[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: ProgressHandler | None = None,
+) -> int:
+    """Rewrite the Parquet file at `source` into `dest`, one record batch at a time.
+
+    `format_name` is either "parquet", which writes GeoParquet metadata for the geometry
+    columns, or "arrow", which writes an Arrow IPC file. Only one record batch is held in
+    memory at any given time. Returns the number of rows written.
+    """
+    geometry_columns = geometry_columns or []
+    start = time.monotonic()
+    rows = 0
+    written = 0
+
+    reader = pyarrow.parquet.ParquetFile(source)
+    schema = reader.schema_arrow
+    geometry_columns = [name for name in geometry_columns if name in schema.names]
+    if format_name == "parquet":
+        if geometry_columns:
+            schema = schema.with_metadata(geoparquet_metadata(schema, geometry_columns))
+        writer = pyarrow.parquet.ParquetWriter(dest, schema)
+    elif format_name == "arrow":
+        schema = geoarrow_schema(schema, geometry_columns)
+        writer = pyarrow.ipc.new_file(dest, schema)
+    else:
+        raise ValueError(f"Unsupported export format: {format_name}")
+
+    try:
+        for batch in reader.iter_batches(batch_size=batch_size):
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(batch.columns, schema=schema))
+            rows += batch.num_rows
+            written += batch.nbytes
+            if progress:
+                progress(ExportProgress("write", written, rows, time.monotonic() - start))
+    finally:
+        writer.close()
+        reader.close()
+
+    return rows
+
+
+def temporary_path(path: str) -> str:
+    """A temporary download location next to `path`, on the same filesystem."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.download")
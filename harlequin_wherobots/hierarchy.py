@@ -0,0 +1,53 @@
+import json
+import sys
+
+
+class CatalogRecord:
+    """A catalog from the Wherobots catalog hierarchy."""
+
+    __slots__ = ("name", "ext_id", "databases")
+
+    def __init__(self, name: str, ext_id: str, databases: list["DatabaseRecord"]) -> None:
+        self.name = name
+        self.ext_id = ext_id
+        self.databases = databases
+
+
+class DatabaseRecord:
+    """A database (namespace) from the Wherobots catalog hierarchy."""
+
+    __slots__ = ("name", "tables")
+
+    def __init__(self, name: str, tables: list[str]) -> None:
+        self.name = name
+        self.tables = tables
+
+
+def _hierarchy_hook(obj: dict):
+    """Convert each JSON object of the hierarchy into its compact record as it is parsed.
+
+    Objects are decoded innermost first, so the raw dicts of a database's tables are
+    released as soon as the database itself is decoded, and the full raw hierarchy is
+    never held in memory. Tables are reduced to their (interned) name.
+    """
+    if "catalogs" in obj:
+        return obj["catalogs"]
+    if "databases" in obj:
+        return CatalogRecord(sys.intern(obj["name"]), obj["extId"], [
+            db for db in obj["databases"] if isinstance(db, DatabaseRecord)
+        ])
+    if "tables" in obj:
+        return DatabaseRecord(sys.intern(obj["name"]), [
+            table for table in obj["tables"] if isinstance(table, str)
+        ])
+    if "name" in obj and isinstance(obj["name"], str):
+        return sys.intern(obj["name"])
+    return obj
+
+
+def parse_hierarchy(data: bytes | str) -> list[CatalogRecord]:
+    """Parse the response of the `/catalogs/hierarchy` endpoint into compact records."""
+    catalogs = json.loads(data, object_hook=_hierarchy_hook)
+    if not isinstance(catalogs, list):
+        raise ValueError("Missing catalogs in catalog hierarchy")
+    return catalogs
@@ -0,0 +1,38 @@
+import re
+
+HEAVY = "heavy"
+LIGHT = "light"
+
+# Explicit routing hint, as a SQL comment anywhere in the query: `-- wherobots:heavy`
+# or `/* wherobots:light */`.
+_HINT = re.compile(r"(?:--|/\*)\s*wherobots:\s*(heavy|light)\b", re.IGNORECASE)
+
+_SIZE = re.compile(r"sizeInBytes=([\d.]+)\s*(B|KiB|MiB|GiB|TiB|PiB|EiB)")
+_UNITS = {
+    "B": 1,
+    "KiB": 2**10,
+    "MiB": 2**20,
+    "GiB": 2**30,
+    "TiB": 2**40,
+    "PiB": 2**50,
+    "EiB": 2**60,
+}
+
+# Spark reports relations without statistics with a size of Long.MaxValue (8.0 EiB).
+_UNKNOWN_SIZE = 8 * 2**60
+
+
+def routing_hint(query: str) -> str | None:
+    """The explicit routing hint of a query, HEAVY or LIGHT, if it has one."""
+    match = _HINT.search(query)
+    return match.group(1).lower() if match else None
+
+
+def estimated_size(plan: str) -> float | None:
+    """The largest data size estimated by an `EXPLAIN COST` plan, in bytes.
+
+    Returns None if the plan carries no usable statistics.
+    """
+    sizes = [float(value) * _UNITS[unit] for value, unit in _SIZE.findall(plan)]
+    sizes = [size for size in sizes if size < _UNKNOWN_SIZE]
+    return max(sizes) if sizes else None
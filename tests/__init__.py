@@ -0,0 +1,25 @@
+import itertools
+import unittest
+from unittest.mock import Mock, patch
+
+from harlequin_wherobots.adapter import HarlequinWherobotsConnection
+
+
+def connect_mocked(
+    test: unittest.TestCase, *sessions: Mock, **options
+) -> tuple[HarlequinWherobotsConnection, Mock]:
+    """Build a connection to mocked SQL sessions, without a keepalive thread.
+
+    Each call to the driver's connect() returns the next of `sessions`, and the last
+    one once they run out. Returns the connection along with the patched connect(),
+    which is restored when `test` is cleaned up.
+    """
+    patcher = patch(
+        "harlequin_wherobots.adapter.connect",
+        side_effect=itertools.chain(sessions, itertools.repeat(sessions[-1])),
+    )
+    connect = patcher.start()
+    test.addCleanup(patcher.stop)
+    options.setdefault("keepalive_interval", None)
+    conn = HarlequinWherobotsConnection(host="api.cloud.wherobots.com", api_key="test-key", **options)
+    return conn, connect
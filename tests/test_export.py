@@ -0,0 +1,159 @@
+"""Unit tests for streaming query results exports."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+import pandas
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+from wherobots.db import StoreResult
+from wherobots.db.errors import OperationalError
+
+from harlequin_wherobots import export
+from tests import connect_mocked
+
+# WKB for POINT (1 2)
+POINT_WKB = bytes.fromhex("0101000000000000000000f03f0000000000000040")
+
+
+class TestExport(unittest.TestCase):
+    """Test the download and transcoding steps of an export."""
+
+    def setUp(self):
+        """Set up a temporary directory with a source Parquet file."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "source.parquet")
+        table = pyarrow.table({
+            "id": pyarrow.array(range(10), pyarrow.int64()),
+            "geom": pyarrow.array([POINT_WKB] * 10, pyarrow.binary()),
+        })
+        pyarrow.parquet.write_table(table, self.source)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_transcode_geoparquet(self):
+        """Test that Parquet exports carry GeoParquet metadata for geometry columns."""
+        dest = os.path.join(self.tmp.name, "out.parquet")
+        progress = Mock()
+
+        rows = export.transcode(
+            self.source, dest, "parquet",
+            geometry_columns=["geom"], batch_size=3, progress=progress,
+        )
+
+        self.assertEqual(rows, 10)
+        # One progress report per record batch
+        self.assertEqual(progress.call_count, 4)
+        self.assertEqual(progress.call_args[0][0].rows_done, 10)
+
+        result = pyarrow.parquet.read_table(dest)
+        self.assertEqual(result.num_rows, 10)
+        geo = json.loads(result.schema.metadata[b"geo"])
+        self.assertEqual(geo["primary_column"], "geom")
+        self.assertEqual(geo["columns"]["geom"]["encoding"], "WKB")
+
+    def test_transcode_parquet_without_geometry(self):
+        """Test that Parquet exports without geometry columns have no GeoParquet metadata."""
+        dest = os.path.join(self.tmp.name, "out.parquet")
+
+        export.transcode(self.source, dest, "parquet", geometry_columns=["missing"])
+
+        result = pyarrow.parquet.read_table(dest)
+        self.assertNotIn(b"geo", result.schema.metadata or {})
+
+    def test_transcode_arrow(self):
+        """Test exporting to an Arrow IPC file."""
+        dest = os.path.join(self.tmp.name, "out.arrow")
+
+        rows = export.transcode(self.source, dest, "arrow", geometry_columns=["geom"], batch_size=4)
+
+        self.assertEqual(rows, 10)
+        with pyarrow.ipc.open_file(dest) as reader:
+            self.assertEqual(reader.num_record_batches, 3)
+            field = reader.schema.field("geom")
+            self.assertEqual(field.metadata[b"ARROW:extension:name"], b"geoarrow.wkb")
+
+    def test_transcode_unsupported_format(self):
+        """Test that unknown formats are rejected."""
+        with self.assertRaises(ValueError):
+            export.transcode(self.source, os.path.join(self.tmp.name, "out.csv"), "csv")
+
+    @patch("requests.get")
+    def test_download(self, mock_get):
+        """Test that downloads are streamed to disk in chunks."""
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.iter_content.return_value = [b"abc", b"def"]
+        mock_get.return_value = response
+        progress = Mock()
+
+        dest = os.path.join(self.tmp.name, "download")
+        written = export.download("https://example.com/result", dest, progress=progress)
+
+        self.assertEqual(written, 6)
+        self.assertEqual(progress.call_count, 2)
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), b"abcdef")
+        mock_get.assert_called_once_with("https://example.com/result", stream=True)
+
+    @patch("harlequin_wherobots.export.download")
+    def test_connection_export(self, mock_download):
+        """Test that geometry columns are converted to WKB in the exported query."""
+        session = Mock(name="session")
+        conn, _ = connect_mocked(self, session)
+        describe_cursor = Mock()
+        describe_cursor.fetchall.return_value = pandas.DataFrame({
+            "col_name": ["id", "geom"],
+            "data_type": ["bigint", "geometry"],
+        })
+        store_cursor = Mock()
+        store_cursor.get_store_result.return_value = StoreResult("https://example.com/result")
+        session.cursor.side_effect = [describe_cursor, store_cursor]
+
+        def fake_download(url, path, progress=None):
+            pyarrow.parquet.write_table(pyarrow.parquet.read_table(self.source), path)
+
+        mock_download.side_effect = fake_download
+
+        dest = os.path.join(self.tmp.name, "out.parquet")
+        rows = conn.export("SELECT * FROM t;", dest, progress=None)
+
+        self.assertEqual(rows, 10)
+        describe_cursor.execute.assert_called_once_with("DESCRIBE QUERY SELECT * FROM t")
+        query = store_cursor.execute.call_args[0][0]
+        self.assertEqual(query, "SELECT `id`, ST_AsBinary(`geom`) AS `geom` FROM (\nSELECT * FROM t\n)")
+        self.assertIn(b"geo", pyarrow.parquet.read_table(dest).schema.metadata)
+        # The temporary download was cleaned up
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["out.parquet", "source.parquet"])
+
+    @patch("harlequin_wherobots.export.download")
+    def test_connection_export_reconnects(self, mock_download):
+        """Test that exports interrupted by a connection loss are resubmitted."""
+        session = Mock(name="session")
+        new_session = Mock(name="new_session")
+        describe_cursor = Mock()
+        describe_cursor.fetchall.return_value = pandas.DataFrame({"col_name": ["id"], "data_type": ["bigint"]})
+        dead_cursor = Mock()
+        dead_cursor.execute.side_effect = OperationalError("SQL connection lost (session=s, execution=e)")
+        session.cursor.side_effect = [describe_cursor, dead_cursor]
+        store_cursor = new_session.cursor.return_value
+        store_cursor.get_store_result.return_value = StoreResult("https://example.com/result")
+        mock_download.side_effect = lambda url, path, progress=None: pyarrow.parquet.write_table(
+            pyarrow.parquet.read_table(self.source), path
+        )
+
+        conn, _ = connect_mocked(self, session, new_session)
+        rows = conn.export("SELECT id FROM t", os.path.join(self.tmp.name, "out.parquet"), progress=None)
+
+        self.assertEqual(rows, 10)
+        store_cursor.execute.assert_called_once()
+        self.assertEqual(store_cursor.execute.call_args[0][0], "SELECT id FROM t")
+
+
+if __name__ == '__main__':
+    unittest.main()
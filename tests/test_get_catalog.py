@@ -0,0 +1,127 @@
+"""Unit tests for HarlequinWherobotsConnection.get_catalog and the catalog hierarchy parsing."""
+
+import json
+import unittest
+from unittest.mock import Mock, patch
+
+from harlequin.exception import HarlequinError
+
+from harlequin_wherobots.adapter import HarlequinWherobotsConnection
+from harlequin_wherobots.hierarchy import CatalogRecord, DatabaseRecord, parse_hierarchy
+
+HIERARCHY = {
+    "catalogs": [
+        {
+            "name": "wherobots",
+            "extId": "catalog-1",
+            "type": "iceberg",
+            "databases": [
+                {
+                    "name": "overture",
+                    "tables": [
+                        {"name": "places", "type": "table", "properties": {"name": "ignored"}},
+                        {"name": "buildings", "type": "table"},
+                    ],
+                },
+                {"name": "empty", "tables": []},
+            ],
+        },
+    ],
+}
+
+SCHEMA = {
+    "name": "table",
+    "schema": {
+        "type": "struct",
+        "fields": [
+            {"id": 1, "name": "id", "type": "string", "required": True},
+            {"id": 2, "name": "geometry", "type": "geometry", "required": False},
+        ],
+    },
+}
+
+
+class TestParseHierarchy(unittest.TestCase):
+    """Test the parsing of the catalog hierarchy into compact records."""
+
+    def test_parse_hierarchy(self):
+        """Test that the hierarchy is reduced to catalog, database and table names."""
+        catalogs = parse_hierarchy(json.dumps(HIERARCHY).encode("utf-8"))
+
+        self.assertEqual(len(catalogs), 1)
+        catalog = catalogs[0]
+        self.assertIsInstance(catalog, CatalogRecord)
+        self.assertEqual(catalog.name, "wherobots")
+        self.assertEqual(catalog.ext_id, "catalog-1")
+        self.assertEqual([db.name for db in catalog.databases], ["overture", "empty"])
+        self.assertIsInstance(catalog.databases[0], DatabaseRecord)
+        self.assertEqual(catalog.databases[0].tables, ["places", "buildings"])
+        self.assertEqual(catalog.databases[1].tables, [])
+
+    def test_records_have_slots(self):
+        """Test that records don't carry a per-instance __dict__."""
+        catalog = parse_hierarchy(json.dumps(HIERARCHY))[0]
+        self.assertFalse(hasattr(catalog, "__dict__"))
+        self.assertFalse(hasattr(catalog.databases[0], "__dict__"))
+
+    def test_parse_invalid_hierarchy(self):
+        """Test that a hierarchy without catalogs is rejected."""
+        with self.assertRaises(ValueError):
+            parse_hierarchy(b'{"foo": "bar"}')
+        with self.assertRaises(KeyError):
+            parse_hierarchy(b'{"catalogs": [{"name": "c", "databases": []}]}')
+
+
+class TestGetCatalog(unittest.TestCase):
+    """Test building the full catalog."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.conn = HarlequinWherobotsConnection.__new__(HarlequinWherobotsConnection)
+        self.conn.host = "api.cloud.wherobots.com"
+        self.conn.headers = {"X-API-Key": "test-key"}
+
+    @patch("requests.get")
+    def test_get_catalog(self, mock_get):
+        """Test that the catalog tree is built with shared, qualified identifiers."""
+        def get(url, headers):
+            response = Mock()
+            response.status_code = 200
+            if url.endswith("/catalogs/hierarchy"):
+                response.content = json.dumps(HIERARCHY).encode("utf-8")
+            else:
+                response.json.return_value = SCHEMA
+            return response
+
+        mock_get.side_effect = get
+
+        catalog = self.conn.get_catalog()
+
+        self.assertEqual(len(catalog.items), 1)
+        db = catalog.items[0].children[0]
+        self.assertEqual(db.qualified_identifier, "wherobots.overture")
+        self.assertIs(db.qualified_identifier, db.query_name)
+
+        table = db.children[0]
+        self.assertEqual(table.qualified_identifier, "wherobots.overture.places")
+        self.assertIs(table.qualified_identifier, table.query_name)
+        self.assertEqual(table.label, "places")
+
+        self.assertEqual([c.label for c in table.children], ["id", "geometry"])
+        self.assertEqual(table.children[1].qualified_identifier, "wherobots.overture.places.geometry")
+        # Column names and type labels are shared across tables.
+        other = db.children[1]
+        self.assertIs(table.children[0].label, other.children[0].label)
+        self.assertIs(table.children[1].type_label, other.children[1].type_label)
+
+    @patch("requests.get")
+    def test_get_catalog_invalid_data(self, mock_get):
+        """Test that invalid catalog data is reported."""
+        mock_get.return_value = Mock(content=b"not json")
+
+        with self.assertRaises(HarlequinError):
+            self.conn.get_catalog()
+
+
+if __name__ == '__main__':
+    unittest.main()
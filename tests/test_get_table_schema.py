@@ -475,6 +475,164 @@ class TestGetTableSchema(unittest.TestCase):
         self.assertEqual(mock_logging.call_count, 2)
         self.assertIn("Unexpected field_type format", mock_logging.call_args_list[0][0][0])
 
+    @patch('requests.get')
+    @patch('logging.warning')
+    def test_invalid_field_name(self, mock_logging, mock_get):
+        """Test that fields with a non-string name are skipped, keeping the other columns."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "name": "test_table",
+            "schema": {
+                "type": "struct",
+                "fields": [
+                    {"id": 1, "name": 12345, "type": "string", "required": True},
+                    {"id": 2, "name": "geometry", "type": "geometry", "required": False},
+                ]
+            }
+        }
+        mock_get.return_value = mock_response
+
+        children = []
+        self.conn._HarlequinWherobotsConnection__get_table_schema(
+            catalog_id="test-catalog-id",
+            catalog="test_catalog",
+            db="test_db",
+            table="test_table",
+            into=children
+        )
+
+        self.assertEqual([child.label for child in children], ["geometry"])
+        self.assertIn("Invalid field name", mock_logging.call_args[0][0])
+
+    @patch('requests.get')
+    def test_nested_struct_children(self, mock_get):
+        """Test that struct columns lazily expand into their fields with dotted names."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "name": "test_table",
+            "schema": {
+                "type": "struct",
+                "fields": [
+                    {
+                        "id": 1,
+                        "name": "names",
+                        "type": {
+                            "type": "struct",
+                            "fields": [
+                                {"id": 2, "name": "primary", "type": "string", "required": False},
+                                {
+                                    "id": 3,
+                                    "name": "rules",
+                                    "type": {
+                                        "type": "list",
+                                        "element-id": 4,
+                                        "element": {
+                                            "type": "struct",
+                                            "fields": [
+                                                {"id": 5, "name": "value", "type": "string", "required": False},
+                                            ]
+                                        },
+                                        "element-required": False
+                                    },
+                                    "required": False
+                                }
+                            ]
+                        },
+                        "required": False
+                    }
+                ]
+            }
+        }
+        mock_get.return_value = mock_response
+
+        children = []
+        self.conn._HarlequinWherobotsConnection__get_table_schema(
+            catalog_id="test-catalog-id",
+            catalog="test_catalog",
+            db="test_db",
+            table="test_table",
+            into=children
+        )
+
+        # Nested fields are not materialized until expanded
+        names = children[0]
+        self.assertEqual(names.type_label, "struct")
+        self.assertEqual(names.children, [])
+        self.assertFalse(names.loaded)
+
+        fields = names.fetch_children()
+        self.assertEqual([f.label for f in fields], ["primary", "rules"])
+        self.assertEqual(fields[0].type_label, "string")
+        self.assertEqual(fields[0].query_name, "names.primary")
+        self.assertEqual(fields[0].qualified_identifier, "test_catalog.test_db.test_table.names.primary")
+
+        rules = fields[1]
+        self.assertEqual(rules.type_label, "list")
+        element = rules.fetch_children()
+        self.assertEqual(len(element), 1)
+        self.assertEqual(element[0].label, "element")
+        self.assertEqual(element[0].type_label, "struct")
+        self.assertEqual(element[0].query_name, "names.rules[0]")
+
+        value = element[0].fetch_children()[0]
+        self.assertEqual(value.query_name, "names.rules[0].value")
+        self.assertEqual(value.qualified_identifier, "test_catalog.test_db.test_table.names.rules.element.value")
+
+    @patch('requests.get')
+    def test_nested_map_children(self, mock_get):
+        """Test that map columns expand into lists of their keys and values."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "name": "test_table",
+            "schema": {
+                "type": "struct",
+                "fields": [
+                    {
+                        "id": 1,
+                        "name": "metadata",
+                        "type": {
+                            "type": "map",
+                            "key-id": 2,
+                            "key": "string",
+                            "value-id": 3,
+                            "value": {"type": "list", "element-id": 4, "element": "int", "element-required": False},
+                            "value-required": False
+                        },
+                        "required": False
+                    }
+                ]
+            }
+        }
+        mock_get.return_value = mock_response
+
+        children = []
+        self.conn._HarlequinWherobotsConnection__get_table_schema(
+            catalog_id="test-catalog-id",
+            catalog="test_catalog",
+            db="test_db",
+            table="test_table",
+            into=children
+        )
+
+        keys, values = children[0].fetch_children()
+        self.assertEqual((keys.label, keys.type_label, keys.query_name), ("keys", "list", "map_keys(metadata)"))
+        self.assertEqual((values.label, values.type_label, values.query_name), ("values", "list", "map_values(metadata)"))
+
+        key = keys.fetch_children()[0]
+        self.assertEqual((key.type_label, key.query_name), ("string", "map_keys(metadata)[0]"))
+
+        # The values are lists themselves; their elements are ints.
+        value = values.fetch_children()[0]
+        self.assertEqual((value.type_label, value.query_name), ("list", "map_values(metadata)[0]"))
+        element = value.fetch_children()[0]
+        self.assertEqual((element.type_label, element.query_name), ("int", "map_values(metadata)[0][0]"))
+        self.assertEqual(
+            element.qualified_identifier, "test_catalog.test_db.test_table.metadata.values.element.element"
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
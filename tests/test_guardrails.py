@@ -0,0 +1,155 @@
+"""Unit tests for query result size and time guardrails."""
+
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+import pandas
+from harlequin.exception import HarlequinQueryError
+from wherobots.db.errors import OperationalError
+
+from tests import connect_mocked
+
+CONNECTION_LOST = OperationalError("SQL connection lost (session=s, execution=e). Commit outcome is unknown")
+
+
+class ManualTimer:
+    """A stand-in for threading.Timer, only firing when told to."""
+
+    timer: "ManualTimer | None" = None
+
+    def __init__(self, interval, function):
+        self.function = function
+        ManualTimer.timer = self
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    @staticmethod
+    def fire(*args):
+        ManualTimer.timer.function()
+
+
+class TestGuardrails(unittest.TestCase):
+    """Test that oversized or slow results are cut short."""
+
+    def setUp(self):
+        """Set up a connection to a mocked SQL session."""
+        self.session = Mock(name="session")
+        self.cursor = self.session.cursor.return_value
+        self.cursor.fetchall.return_value = pandas.DataFrame({"name": [f"row-{i}" for i in range(11)]})
+        self.conn, _ = connect_mocked(self, self.session)
+
+    def test_no_limits(self):
+        """Test that results are untouched without limits."""
+        hc = self.conn.execute("SELECT * FROM t")
+
+        self.cursor.execute.assert_called_once_with("SELECT * FROM t")
+        self.assertEqual(hc.fetchall().num_rows, 11)
+        self.assertIsNone(hc.warning)
+
+    def test_max_rows(self):
+        """Test that the row limit is pushed down, and truncation reported."""
+        self.conn.max_rows = 10
+
+        hc = self.conn.execute("SELECT * FROM t;")
+
+        self.cursor.execute.assert_called_once_with("SELECT * FROM (\nSELECT * FROM t\n) LIMIT 11")
+        self.assertEqual(hc.fetchall().num_rows, 10)
+        self.assertIn("first 10 rows", hc.warning)
+
+    def test_max_rows_not_reached(self):
+        """Test that results within the row limit are not reported as truncated."""
+        self.conn.max_rows = 20
+
+        hc = self.conn.execute("SELECT * FROM t")
+
+        self.assertEqual(hc.fetchall().num_rows, 11)
+        self.assertIsNone(hc.warning)
+
+    def test_max_rows_only_limits_queries(self):
+        """Test that statements that can't be nested are not rewritten."""
+        self.conn.max_rows = 10
+
+        self.conn.execute("SHOW TABLES")
+
+        self.cursor.execute.assert_called_once_with("SHOW TABLES")
+
+    def test_max_bytes(self):
+        """Test that results are truncated to fit the size limit."""
+        results = self.cursor.fetchall.return_value
+        self.conn.max_bytes = results.memory_usage(deep=True, index=False).sum() // 2
+
+        hc = self.conn.execute("SELECT * FROM t")
+
+        self.assertEqual(hc.fetchall().num_rows, 5)
+        self.assertIn("MiB", hc.warning)
+
+    def test_max_fetch_seconds(self):
+        """Test that slow queries are cancelled once the fetch time limit is exceeded."""
+        self.conn.max_fetch_seconds = 0.01
+        cancelled = threading.Event()
+
+        def fetchall():
+            self.assertTrue(cancelled.wait(timeout=5))
+            # Like the driver, a cancelled query completes with empty results.
+            return pandas.DataFrame()
+
+        self.cursor.fetchall.side_effect = fetchall
+        self.cursor.close.side_effect = cancelled.set
+
+        hc = self.conn.execute("SELECT * FROM t")
+        with self.assertRaisesRegex(HarlequinQueryError, "fetch time limit"):
+            hc.fetchall()
+
+    def test_max_fetch_seconds_during_retry(self):
+        """Test that a query resubmitted as the fetch time limit is exceeded is cancelled."""
+        self.conn.max_fetch_seconds = 300
+        self.cursor.fetchall.side_effect = [CONNECTION_LOST]
+        hc = self.conn.execute("SELECT * FROM t")
+        # The time limit is exceeded while the query is being resubmitted.
+        self.cursor.execute.side_effect = lambda query: ManualTimer.fire()
+
+        with patch("threading.Timer", ManualTimer):
+            with self.assertRaisesRegex(HarlequinQueryError, "fetch time limit"):
+                hc.fetchall()
+
+        self.assertEqual(self.cursor.execute.call_count, 2)
+        self.assertEqual(self.cursor.close.call_count, 2)
+
+    def test_max_fetch_seconds_after_fetch(self):
+        """Test that results are kept if the time limit is exceeded right as they arrive."""
+        self.conn.max_fetch_seconds = 300
+        hc = self.conn.execute("SELECT * FROM t")
+
+        with patch("threading.Timer", ManualTimer):
+            # The timer fires as it is being cancelled.
+            with patch.object(ManualTimer, "cancel", ManualTimer.fire):
+                self.assertEqual(hc.fetchall().num_rows, 11)
+
+        self.assertFalse(hc.timed_out)
+
+    def test_guardrails_message(self):
+        """Test that active guardrails are announced when connecting."""
+        self.assertEqual(self.conn.init_message, "")
+
+        conn, _ = connect_mocked(self, self.session, max_rows=1000, max_bytes=2**29, max_fetch_seconds=300)
+
+        self.assertEqual(
+            conn.init_message,
+            "Query results are truncated to 1000 rows and 512 MiB. "
+            "Queries are cancelled after 300s of fetching.",
+        )
+
+    def test_set_limit(self):
+        """Test that Harlequin's own row limit is honored."""
+        hc = self.conn.execute("SELECT * FROM t").set_limit(3)
+
+        self.assertEqual(hc.fetchall().num_rows, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
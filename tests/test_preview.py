@@ -0,0 +1,110 @@
+"""Unit tests for table previews."""
+
+import unittest
+from unittest.mock import Mock
+
+import pandas
+
+from harlequin_wherobots.adapter import TableCatalogItem
+from tests import connect_mocked
+
+
+class TestPreview(unittest.TestCase):
+    """Test preview query generation and memoization."""
+
+    def setUp(self):
+        """Set up a connection to a mocked SQL session."""
+        self.session = Mock(name="session")
+        self.session.cursor.return_value.fetchall.return_value = pandas.DataFrame({"id": [1, 2]})
+        self.conn, _ = connect_mocked(self, self.session, preview_cache_size=2)
+
+    def test_preview_query(self):
+        """Test that preview queries are bounded, and sampled when requested."""
+        self.assertEqual(self.conn.preview_query("c.db.t"), "SELECT * FROM c.db.t LIMIT 100")
+
+        self.conn.preview_sample_percent = 0.1
+        self.assertEqual(
+            self.conn.preview_query("c.db.t", limit=10),
+            "SELECT * FROM c.db.t TABLESAMPLE (0.1 PERCENT) LIMIT 10",
+        )
+
+    def test_preview_is_memoized(self):
+        """Test that re-running a preview is served from the cache."""
+        query = self.conn.preview_query("c.db.t")
+
+        self.assertEqual(self.conn.execute(query).fetchall().num_rows, 2)
+        cached = self.conn.execute(f"  {query}\n")
+
+        self.assertEqual(self.session.cursor.return_value.execute.call_count, 1)
+        self.assertEqual(cached.fetchall().num_rows, 2)
+        self.assertEqual(cached.columns(), [("id", "integer")])
+
+    def test_preview_expires(self):
+        """Test that memoized previews are run again once their TTL expires."""
+        self.conn.preview_ttl = 0
+        query = self.conn.preview_query("c.db.t")
+
+        self.conn.execute(query).fetchall()
+        self.conn.execute(query).fetchall()
+
+        self.assertEqual(self.session.cursor.return_value.execute.call_count, 2)
+
+    def test_writes_invalidate_previews(self):
+        """Test that previews are run again after a statement that may write data."""
+        query = self.conn.preview_query("c.db.t")
+        self.conn.execute(query).fetchall()
+
+        self.conn.execute("INSERT INTO c.db.t VALUES (3)")
+        self.conn.execute(query).fetchall()
+
+        self.assertEqual(self.session.cursor.return_value.execute.call_count, 3)
+
+    def test_other_queries_are_not_memoized(self):
+        """Test that regular queries are always executed."""
+        self.conn.execute("SELECT 1").fetchall()
+        self.conn.execute("SELECT 1").fetchall()
+
+        self.assertEqual(self.session.cursor.return_value.execute.call_count, 2)
+
+    def test_preview_cache_is_bounded(self):
+        """Test that only the last N previews are remembered."""
+        first = self.conn.preview_query("c.db.a")
+        self.conn.execute(first).fetchall()
+        self.conn.execute(self.conn.preview_query("c.db.b")).fetchall()
+        self.conn.execute(self.conn.preview_query("c.db.c")).fetchall()
+
+        self.assertNotIn(first, self.conn.previews)
+        self.conn.execute(first).fetchall()
+        self.assertEqual(self.session.cursor.return_value.execute.call_count, 4)
+
+    def test_unrun_previews_are_not_cached(self):
+        """Test that generating preview queries does not evict the results of others."""
+        query = self.conn.preview_query("c.db.a")
+        self.conn.execute(query).fetchall()
+        self.conn.preview_query("c.db.b")
+        self.conn.preview_query("c.db.c")
+
+        self.assertIn(query, self.conn.previews)
+        self.conn.execute(query).fetchall()
+        self.assertEqual(self.session.cursor.return_value.execute.call_count, 1)
+
+    def test_preview_interaction(self):
+        """Test that the catalog interaction opens the preview query in a new buffer."""
+        item = TableCatalogItem(
+            qualified_identifier="c.db.t",
+            query_name="c.db.t",
+            label="t",
+            type_label="table",
+            children=[],
+            connection=self.conn,
+        )
+        driver = Mock()
+
+        label, interaction = TableCatalogItem.INTERACTIONS[0]
+        interaction(item, driver)
+
+        driver.insert_text_in_new_buffer.assert_called_once_with("SELECT * FROM c.db.t LIMIT 100")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Unit tests for reconnection and retries of HarlequinWherobotsConnection."""
+
+import threading
+import unittest
+from unittest.mock import Mock
+
+import pandas
+from harlequin.exception import HarlequinQueryError
+from wherobots.db.errors import OperationalError
+
+from harlequin_wherobots.adapter import _is_connection_lost, _is_read_query
+from tests import connect_mocked
+
+CONNECTION_LOST = OperationalError("SQL connection lost (session=s, execution=e). Commit outcome is unknown")
+
+
+class TestReconnect(unittest.TestCase):
+    """Test the detection of connection losses and the retry of interrupted queries."""
+
+    def setUp(self):
+        """Set up a connection to a mocked SQL session."""
+        self.session = Mock(name="session")
+        self.new_session = Mock(name="new_session")
+        self.conn, self.connect = connect_mocked(self, self.session, self.new_session)
+
+    def test_is_read_query(self):
+        """Test the detection of idempotent read queries."""
+        self.assertTrue(_is_read_query("SELECT * FROM t"))
+        self.assertTrue(_is_read_query("  -- comment\n select 1"))
+        self.assertTrue(_is_read_query("/* hint */ WITH a AS (SELECT 1) SELECT * FROM a"))
+        self.assertTrue(_is_read_query("SHOW TABLES"))
+        self.assertFalse(_is_read_query("INSERT INTO t VALUES (1)"))
+        self.assertFalse(_is_read_query("WITH a AS (SELECT 1) INSERT INTO t SELECT * FROM a"))
+        self.assertFalse(_is_read_query("CREATE TABLE t AS SELECT 1"))
+        self.assertFalse(_is_read_query(""))
+
+    def test_is_connection_lost(self):
+        """Test that only connection losses are detected as such."""
+        self.assertTrue(_is_connection_lost(CONNECTION_LOST))
+        self.assertFalse(_is_connection_lost(OperationalError("Table not found")))
+        self.assertFalse(_is_connection_lost(ValueError("SQL connection lost")))
+
+    def test_execute_reconnects_dead_connection(self):
+        """Test that submitting on a dead connection reconnects and resubmits."""
+        self.session.cursor.return_value.execute.side_effect = CONNECTION_LOST
+
+        hc = self.conn.execute("INSERT INTO t VALUES (1)")
+
+        self.assertIs(self.conn.conn, self.new_session)
+        self.assertIs(hc.cursor, self.new_session.cursor.return_value)
+        self.new_session.cursor.return_value.execute.assert_called_once_with("INSERT INTO t VALUES (1)")
+        self.session.close.assert_called_once()
+
+    def test_fetch_retries_read_query(self):
+        """Test that an interrupted read query is re-executed on a new connection."""
+        self.session.cursor.return_value.fetchall.side_effect = CONNECTION_LOST
+        self.new_session.cursor.return_value.fetchall.return_value = pandas.DataFrame({"a": [1]})
+
+        hc = self.conn.execute("SELECT 1 AS a")
+        table = hc.fetchall()
+
+        self.assertEqual(table.num_rows, 1)
+        self.assertIs(self.conn.conn, self.new_session)
+        self.new_session.cursor.return_value.execute.assert_called_once_with("SELECT 1 AS a")
+
+    def test_fetch_does_not_retry_write_query(self):
+        """Test that an interrupted write is not re-executed."""
+        self.session.cursor.return_value.fetchall.side_effect = CONNECTION_LOST
+
+        hc = self.conn.execute("INSERT INTO t VALUES (1)")
+        with self.assertRaises(HarlequinQueryError):
+            hc.fetchall()
+
+        self.assertIs(self.conn.conn, self.session)
+
+    def test_fetch_retries_are_bounded(self):
+        """Test that retries stop after max_retries attempts."""
+        self.conn.max_retries = 1
+        self.session.cursor.return_value.fetchall.side_effect = CONNECTION_LOST
+        self.new_session.cursor.return_value.fetchall.side_effect = CONNECTION_LOST
+
+        hc = self.conn.execute("SELECT 1")
+        with self.assertRaises(HarlequinQueryError):
+            hc.fetchall()
+
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_reconnect_skips_already_replaced_connection(self):
+        """Test that concurrent reconnections only re-establish the connection once."""
+        self.conn.reconnect(self.session)
+        self.assertIs(self.conn.reconnect(self.session), self.new_session)
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_keepalive_reconnects(self):
+        """Test that the keepalive detects a dead connection and reconnects."""
+        reconnected = threading.Event()
+        self.session.cursor.return_value.fetchall.side_effect = CONNECTION_LOST
+        self.new_session.cursor.side_effect = lambda: reconnected.set() or Mock()
+        self.conn.keepalive_interval = 0.01
+
+        thread = threading.Thread(target=self.conn._HarlequinWherobotsConnection__keepalive, daemon=True)
+        thread.start()
+        self.assertTrue(reconnected.wait(timeout=5))
+        self.conn.close()
+        thread.join(timeout=5)
+
+        self.assertIs(self.conn.conn, self.new_session)
+        self.session.cursor.return_value.execute.assert_called_with("SELECT 1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""Unit tests for routing heavy queries to a larger runtime session."""
+
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+import pandas
+from wherobots.db import Runtime, StoreResult
+from wherobots.db.errors import OperationalError
+
+from harlequin_wherobots.routing import estimated_size, routing_hint
+from tests import connect_mocked
+
+PLAN = """== Optimized Logical Plan ==
+Aggregate [count(1) AS count#12L], Statistics(sizeInBytes=16.0 B, rowCount=1)
++- Project, Statistics(sizeInBytes=12.5 GiB)
+   +- RelationV2[id#1] places, Statistics(sizeInBytes=25.0 GiB)
+   +- LocalRelation <empty>, Statistics(sizeInBytes=8.0 EiB)
+"""
+
+CONNECTION_LOST = OperationalError("SQL connection lost (session=s, execution=e). Commit outcome is unknown")
+
+
+class TestRoutingHelpers(unittest.TestCase):
+    """Test routing hints and plan size estimates."""
+
+    def test_routing_hint(self):
+        self.assertEqual(routing_hint("-- wherobots:heavy\nSELECT * FROM t"), "heavy")
+        self.assertEqual(routing_hint("SELECT /* Wherobots: LIGHT */ * FROM t"), "light")
+        self.assertIsNone(routing_hint("SELECT 'wherobots:heavy' FROM t"))
+        self.assertIsNone(routing_hint("SELECT * FROM t"))
+
+    def test_estimated_size(self):
+        """Test that the largest known size is used, ignoring unknown statistics."""
+        self.assertEqual(estimated_size(PLAN), 25 * 2**30)
+        self.assertIsNone(estimated_size("Statistics(sizeInBytes=8.0 EiB)"))
+        self.assertIsNone(estimated_size("== Physical Plan =="))
+
+
+class TestRouting(unittest.TestCase):
+    """Test dispatching queries between the light and heavy sessions."""
+
+    def setUp(self):
+        """Set up a connection with mocked light and heavy sessions."""
+        self.light = Mock(name="light")
+        self.light.cursor.return_value.fetchall.return_value = pandas.DataFrame({"plan": [PLAN]})
+        self.heavy = Mock(name="heavy")
+        self.heavy.cursor.return_value.fetchall.return_value = pandas.DataFrame({"a": [1]})
+        self.conn, self.connect = connect_mocked(
+            self, self.light, self.heavy, heavy_runtime="LARGE", heavy_threshold=10 * 2**30,
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_no_heavy_runtime(self):
+        """Test that everything runs on the single session without a heavy runtime."""
+        self.conn.heavy_runtime = None
+        self.assertFalse(self.conn.route("-- wherobots:heavy\nSELECT * FROM t"))
+
+    def test_route_by_hint(self):
+        """Test that hints route queries without estimating their cost."""
+        self.assertTrue(self.conn.route("-- wherobots:heavy\nSELECT * FROM t"))
+        self.assertFalse(self.conn.route("-- wherobots:light\nSELECT * FROM t"))
+        self.light.cursor.return_value.execute.assert_not_called()
+
+    def test_route_by_cost(self):
+        """Test that queries are routed by their estimated size."""
+        self.assertTrue(self.conn.route("SELECT * FROM places"))
+        self.light.cursor.return_value.execute.assert_called_once_with("EXPLAIN COST SELECT * FROM places")
+
+        self.conn.heavy_threshold = 100 * 2**30
+        self.assertFalse(self.conn.route("SELECT * FROM places"))
+
+    def test_writes_are_not_estimated(self):
+        """Test that statements which can't be explained stay on the light session."""
+        self.assertFalse(self.conn.route("INSERT INTO t VALUES (1)"))
+        self.light.cursor.return_value.execute.assert_not_called()
+
+    def test_execute_provisions_heavy_session(self):
+        """Test that heavy queries provision and run on the heavy session."""
+        hc = self.conn.execute("-- wherobots:heavy\nSELECT * FROM t")
+
+        self.assertIs(self.conn.heavy, self.heavy)
+        _, kwargs = self.connect.call_args
+        self.assertEqual(kwargs["runtime"], Runtime.LARGE)
+        self.assertTrue(kwargs["force_new"])
+        self.assertEqual(kwargs["shutdown_after_inactive_seconds"], 600)
+        self.assertEqual(self.conn.heavy_active, 1)
+
+        hc.fetchall()
+        self.assertEqual(self.conn.heavy_active, 0)
+
+        # The heavy session is reused by subsequent heavy queries.
+        self.conn.execute("-- wherobots:heavy\nSELECT 1").close()
+        self.assertEqual(self.connect.call_count, 2)
+        self.assertEqual(self.conn.heavy_active, 0)
+
+    @patch("harlequin_wherobots.export.transcode", return_value=1)
+    @patch("harlequin_wherobots.export.download")
+    def test_export_heavy_query(self, mock_download, mock_transcode):
+        """Test that heavy exports are stored from the heavy session."""
+        self.light.cursor.return_value.fetchall.return_value = pandas.DataFrame({
+            "col_name": ["a"], "data_type": ["int"],
+        })
+        heavy_cursor = self.heavy.cursor.return_value
+        heavy_cursor.get_store_result.return_value = StoreResult("https://example.com/result")
+
+        self.conn.export("-- wherobots:heavy\nSELECT * FROM t", "out.parquet", progress=None)
+
+        heavy_cursor.execute.assert_called_once()
+        self.assertIn("store", heavy_cursor.execute.call_args[1])
+        self.assertEqual(self.conn.heavy_active, 0)
+
+    def test_provisioning_does_not_hold_lock(self):
+        """Test that concurrent heavy queries share one provisioning, done outside the lock."""
+        provisioning = threading.Event()
+        proceed = threading.Event()
+
+        def connect(**kwargs):
+            provisioning.set()
+            self.assertTrue(proceed.wait(timeout=5))
+            return self.heavy
+
+        self.connect.side_effect = connect
+        sessions = []
+        threads = [
+            threading.Thread(target=lambda: sessions.append(self.conn.submit("SELECT 1", heavy=True)[0]))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.assertTrue(provisioning.wait(timeout=5))
+        # The lock stays available to the reaper and to queries releasing the session.
+        self.assertTrue(self.conn.heavy_lock.acquire(timeout=1))
+        self.conn.heavy_lock.release()
+
+        proceed.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(sessions, [self.heavy, self.heavy])
+        # One connection for the light session, and one for the heavy session.
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_reconnect_heavy_session_already_dropped(self):
+        """Test that reconnecting a heavy session never falls back to the light session."""
+        stale = Mock(name="stale")
+        self.conn.heavy = None
+
+        self.assertIs(self.conn.reconnect(stale, heavy=True), self.heavy)
+        stale.close.assert_not_called()
+        self.assertIs(self.conn.conn, self.light)
+
+    def test_submit_reconnects_heavy_session(self):
+        """Test that a heavy query losing its session is resubmitted on a new heavy session."""
+        dead = Mock(name="dead")
+        dead.cursor.return_value.execute.side_effect = CONNECTION_LOST
+        self.connect.side_effect = [dead, self.heavy]
+
+        conn, _ = self.conn.submit("SELECT 1", heavy=True)
+
+        self.assertIs(conn, self.heavy)
+        dead.close.assert_called_once()
+        self.heavy.cursor.return_value.execute.assert_called_once_with("SELECT 1")
+        self.light.cursor.return_value.execute.assert_not_called()
+
+    def test_idle_heavy_session_is_torn_down(self):
+        """Test that the heavy session is closed once idle."""
+        self.conn.heavy_idle_timeout = 0.01
+        closed = threading.Event()
+        self.heavy.close.side_effect = closed.set
+
+        self.conn.execute("-- wherobots:heavy\nSELECT * FROM t").fetchall()
+
+        self.assertTrue(closed.wait(timeout=5))
+        self.assertIsNone(self.conn.heavy)
+        # The session is never asked to shut down as soon as it is idle.
+        _, kwargs = self.connect.call_args
+        self.assertEqual(kwargs["shutdown_after_inactive_seconds"], 1)
+
+    def test_busy_heavy_session_is_kept(self):
+        """Test that the heavy session is not torn down while a query runs on it."""
+        self.conn.heavy_idle_timeout = 0.01
+        self.conn.execute("-- wherobots:heavy\nSELECT * FROM t")
+
+        threading.Event().wait(0.1)
+        self.assertIs(self.conn.heavy, self.heavy)
+        self.heavy.close.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Unit tests for geometry simplification of query results."""
+
+import unittest
+from unittest.mock import Mock
+
+import pandas
+from wherobots.db.errors import ProgrammingError
+
+from tests import connect_mocked
+
+DESCRIPTION = pandas.DataFrame({
+    "col_name": ["id", "geometry"],
+    "data_type": ["string", "geometry"],
+})
+
+
+class TestSimplifyGeometries(unittest.TestCase):
+    """Test the rewriting of geometry columns in outgoing queries."""
+
+    def setUp(self):
+        """Set up a connection to a mocked SQL session."""
+        self.session = Mock(name="session")
+        self.cursor = self.session.cursor.return_value
+        self.cursor.fetchall.return_value = DESCRIPTION
+        self.conn, _ = connect_mocked(self, self.session, preview_tolerance=0.001)
+
+    def test_simplify_geometries(self):
+        """Test that geometry columns are reduced in precision and simplified."""
+        query = self.conn.simplify_geometries("SELECT * FROM places -- all of them")
+
+        self.cursor.execute.assert_called_once_with("DESCRIBE QUERY SELECT * FROM places -- all of them")
+        self.assertEqual(
+            query,
+            "SELECT `id`, ST_SimplifyPreserveTopology(ST_ReducePrecision(`geometry`, 3), 0.001) AS `geometry` "
+            "FROM (\nSELECT * FROM places -- all of them\n)",
+        )
+
+    def test_no_geometry_columns(self):
+        """Test that queries without geometries are left untouched."""
+        self.cursor.fetchall.return_value = DESCRIPTION.iloc[:1]
+        self.assertEqual(self.conn.simplify_geometries("SELECT id FROM t"), "SELECT id FROM t")
+
+    def test_duplicate_column_names(self):
+        """Test that queries with ambiguous column names are left untouched."""
+        self.cursor.fetchall.return_value = pandas.DataFrame({
+            "col_name": ["id", "geometry", "ID", "geometry"],
+            "data_type": ["string", "geometry", "string", "geometry"],
+        })
+        query = "SELECT * FROM a JOIN b USING (key)"
+        self.assertEqual(self.conn.simplify_geometries(query), query)
+
+    def test_disabled(self):
+        """Test that nothing is rewritten without a preview tolerance."""
+        self.conn.preview_tolerance = None
+        self.assertEqual(self.conn.simplify_geometries("SELECT * FROM t"), "SELECT * FROM t")
+        self.cursor.execute.assert_not_called()
+
+    def test_only_queries_are_rewritten(self):
+        """Test that statements that can't be nested are left untouched."""
+        for statement in ["SHOW TABLES", "EXPLAIN SELECT * FROM t", "INSERT INTO t SELECT * FROM s"]:
+            self.assertEqual(self.conn.simplify_geometries(statement), statement)
+        self.cursor.execute.assert_not_called()
+
+    def test_describe_error(self):
+        """Test that the original query runs if it can't be described."""
+        self.cursor.fetchall.side_effect = ProgrammingError("Table not found")
+        self.assertEqual(self.conn.simplify_geometries("SELECT * FROM missing"), "SELECT * FROM missing")
+
+    def test_execute(self):
+        """Test that executed queries are simplified, but remembered as written."""
+        hc = self.conn.execute("SELECT * FROM places")
+
+        self.assertEqual(hc.query, "SELECT * FROM places")
+        self.assertIn("ST_SimplifyPreserveTopology", hc.statement)
+        self.assertIn("ST_SimplifyPreserveTopology", self.cursor.execute.call_args[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()